@@ -6,6 +6,8 @@ IMAGE_REQUEST_AIHORDE_URL = "https://aihorde.net/api"
 
 RANDOM_MESSAGE_TASK_RETRY_SECONDS = 33 * 60
 
+REGENERATION_MAX_CONCURRENT = 4
+
 GROK_PRIMARY_TRIGGERS = ["grok", "gork"]
 GROK_SECONDARY_TRIGGERS = ["true", "explain", "confirm"]
 GROK_MAX_WORDS = 25
@@ -77,6 +77,8 @@ DEFAULT_GLOBAL = {
             "regen_models": DEFAULT_REGEN_MODELS,
             "random_model_enabled": False,
             "response_ratings": {},
+            "rating_stats": None,  # "model|endpoint" -> rating counts, None until built
+            "removelist_fast_regex": False,
 }
 
 DEFAULT_GUILD = {
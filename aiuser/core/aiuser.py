@@ -1,5 +1,7 @@
+import asyncio
 import logging
 import re
+from collections import OrderedDict
 from datetime import datetime
 
 import discord
@@ -7,6 +9,7 @@ from openai import AsyncOpenAI
 from redbot.core import Config, app_commands, commands
 from redbot.core.bot import Red
 
+from aiuser.config.constants import REGENERATION_MAX_CONCURRENT
 from aiuser.config.defaults import (
     DEFAULT_CHANNEL,
     DEFAULT_GLOBAL,
@@ -21,6 +24,7 @@ from aiuser.dashboard.base import DashboardIntegration
 from aiuser.messages_list.entry import MessageEntry
 from aiuser.settings.base import Settings
 from aiuser.types.abc import CompositeMetaClass
+from aiuser.types.types import TrackedMessage
 from aiuser.utils.cache import Cache
 from aiuser.utils.endpoint_manager import EndpointManager
 from aiuser.utils.response_rating import ResponseRating
@@ -51,12 +55,16 @@ class AIUser(
         self.optindefault: dict[int, bool] = {}
         self.channels_whitelist: dict[int, list[int]] = {}
         self.ignore_regex: dict[int, re.Pattern] = {}
+        self.cached_parameters: dict[int, dict] = {}
+        self.cached_weights: dict[int, dict] = {}
         self.override_prompt_start_time: dict[int, datetime] = {}
         self.cached_messages: Cache[int, MessageEntry] = Cache(limit=100)
         
         # Regeneration system
         self.endpoint_manager = EndpointManager(bot, self.config)
         self.rating_system = ResponseRating(self.config)
+        self.regeneration_semaphore = asyncio.Semaphore(REGENERATION_MAX_CONCURRENT)
+        self.tracked_messages: OrderedDict[int, TrackedMessage] = OrderedDict()
 
         self.config.register_member(**DEFAULT_MEMBER)
         self.config.register_role(**DEFAULT_ROLE)
@@ -81,12 +89,14 @@ class AIUser(
             test_guild = 744802856074346556
             self.override_prompt_start_time[test_guild] = datetime.now()
 
+        self.rating_system.start()
         self.random_message_trigger.start()
 
     async def cog_unload(self):
         if self.openai_client:
             await self.openai_client.close()
         await self.endpoint_manager.close_all_clients()
+        await self.rating_system.stop()
         self.random_message_trigger.cancel()
 
     async def red_delete_data_for_user(self, *, requester, user_id: int):
@@ -101,6 +111,8 @@ class AIUser(
     async def on_red_api_tokens_update(self, service_name, _):
         if service_name in ["openai", "openrouter"]:
             self.openai_client = await setup_openai_client(self.bot, self.config)
+            # endpoint clients were built with the previous keys
+            self.endpoint_manager.reset_clients()
 
     @app_commands.command(name="chat")
     @app_commands.describe(text="The prompt you want to send to the AI.")
@@ -5,7 +5,6 @@ from datetime import datetime, timedelta
 from typing import List
 
 import discord
-import tiktoken
 from discord import Message
 from redbot.core import commands
 
@@ -64,6 +63,7 @@ class MessagesList:
     async def _init(self, prompt=None):
         self.model = await self.config.guild(self.guild).model()
         self.token_limit = await self.config.guild(self.guild).custom_model_tokens_limit() or self._get_token_limit(self.model)
+        import tiktoken
         try:
             self._encoding = tiktoken.encoding_for_model(self.model)
         except KeyError:
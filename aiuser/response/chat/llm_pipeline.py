@@ -5,6 +5,7 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 
 import httpx
 import openai
+from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletion, ChatCompletionMessageToolCall
 from openai.types.completion import Completion
 from redbot.core import Config, commands
@@ -17,32 +18,32 @@ from aiuser.functions.tool_call import ToolCall
 from aiuser.functions.types import ToolCallSchema
 from aiuser.messages_list.messages import MessagesList
 from aiuser.types.abc import MixinMeta
-from aiuser.utils.utilities import get_enabled_tools
+from aiuser.utils.utilities import get_custom_parameters, get_enabled_tools, get_weights
 
 logger = logging.getLogger("red.bz_cogs.aiuser")
 
 
 class LLMPipeline:
-    def __init__(self, cog: MixinMeta, ctx: commands.Context, messages: MessagesList):
+    def __init__(self, cog: MixinMeta, ctx: commands.Context, messages: MessagesList,
+                 client: Optional[AsyncOpenAI] = None, model: Optional[str] = None):
         self.ctx: commands.Context = ctx
+        self.cog = cog
         self.config: Config = cog.config
         self.bot = cog.bot
         self.msg_list = messages
-        self.model = messages.model
+        self.model = model or messages.model
         self.can_reply = messages.can_reply
         self.messages = messages.get_json()
-        self.openai_client = cog.openai_client
+        self.openai_client = client or cog.openai_client
         self.enabled_tools: List[ToolCall] = []
         self.available_tools_schemas: List[ToolCallSchema] = []
         self.completion: Optional[str] = None
 
     async def get_custom_parameters(self) -> Dict[str, Any]:
-        custom_parameters = await self.config.guild(self.ctx.guild).parameters()
-        kwargs = json.loads(custom_parameters) if custom_parameters else {}
+        kwargs = await get_custom_parameters(self.cog, self.ctx.guild)
 
         if "logit_bias" not in kwargs:
-            weights = await self.config.guild(self.ctx.guild).weights()
-            kwargs["logit_bias"] = json.loads(weights or "{}")
+            kwargs["logit_bias"] = await get_weights(self.cog, self.ctx.guild)
 
         if kwargs.get("logit_bias") and self.model in VISION_SUPPORTED_MODELS or self.model in UNSUPPORTED_LOGIT_BIAS_MODELS:
             logger.warning(f"logit_bias is not supported for model {self.model}, removing...")
@@ -1,6 +1,7 @@
 import logging
 import random
 from datetime import datetime, timezone
+from typing import Optional
 
 import discord
 from discord import AllowedMentions
@@ -8,83 +9,98 @@ from redbot.core import Config, commands
 
 from aiuser.messages_list.messages import MessagesList
 from aiuser.response.chat.llm_pipeline import LLMPipeline
-from aiuser.response.regeneration import add_subtle_regeneration, get_random_model
+from aiuser.response.regeneration import (
+    add_subtle_regeneration,
+    create_regeneration_view,
+    get_random_model,
+)
 from aiuser.types.abc import MixinMeta
 from aiuser.utils.response_utils import remove_patterns_from_response
 
 logger = logging.getLogger("red.bz_cogs.aiuser")
 
+NO_MENTIONS = AllowedMentions(everyone=False, roles=False, users=False)
 
-async def should_reply(ctx: commands.Context) -> bool:
-    if ctx.interaction:
-        return False
 
+async def message_exists(ctx: commands.Context) -> bool:
+    # deleted messages are evicted from the client's message cache, recent ones are at its newest end
+    message_id = ctx.message.id
+    if discord.utils.find(lambda m: m.id == message_id, reversed(ctx.bot.cached_messages)):
+        return True
     try:
-        await ctx.fetch_message(ctx.message.id)
+        await ctx.fetch_message(message_id)
     except Exception:
         return False
+    return True
+
+async def should_reply(ctx: commands.Context) -> bool:
+    if ctx.interaction:
+        return False
 
     if (datetime.now(timezone.utc) - ctx.message.created_at).total_seconds() > 8 or random.random() < 0.25:
-        return True
+        return await message_exists(ctx)
 
-    async for last_msg in ctx.message.channel.history(limit=1):
-        if last_msg.author == ctx.message.guild.me:
-            return True
+    last_msg = ctx.message.channel.last_message
+    if last_msg is None:
+        async for last_msg in ctx.message.channel.history(limit=1):
+            break
+    if last_msg and last_msg.author == ctx.message.guild.me:
+        return await message_exists(ctx)
     return False
 
 async def send_response(ctx: commands.Context, response: str, can_reply: bool, 
-                      add_regeneration: bool = True, messages_list: MessagesList = None) -> discord.Message:
-    allowed = AllowedMentions(everyone=False, roles=False, users=[ctx.message.author])
+                      view: Optional[discord.ui.View] = None) -> discord.Message:
+    # only the author may be pinged, which can't happen unless their id is in the text
+    if str(ctx.message.author.id) in response:
+        allowed = AllowedMentions(everyone=False, roles=False, users=[ctx.message.author])
+    else:
+        allowed = NO_MENTIONS
+    kwargs = {"view": view} if view is not None else {}
     message = None
     
     if len(response) >= 2000:
-        for i in range(0, len(response), 2000):
-            message = await ctx.send(response[i:i + 2000], allowed_mentions=allowed)
+        chunks = [response[i:i + 2000] for i in range(0, len(response), 2000)]
+        for chunk in chunks[:-1]:
+            await ctx.send(chunk, allowed_mentions=allowed)
+        message = await ctx.send(chunks[-1], allowed_mentions=allowed, **kwargs)
     elif can_reply and await should_reply(ctx):
-        message = await ctx.message.reply(response, mention_author=False, allowed_mentions=allowed)
+        message = await ctx.message.reply(response, mention_author=False, allowed_mentions=allowed, **kwargs)
     elif ctx.interaction:
-        message = await ctx.interaction.followup.send(response, allowed_mentions=allowed)
+        message = await ctx.interaction.followup.send(response, allowed_mentions=allowed, wait=True, **kwargs)
     else:
-        message = await ctx.send(response, allowed_mentions=allowed)
+        message = await ctx.send(response, allowed_mentions=allowed, **kwargs)
     
     return message
 
 async def create_chat_response(cog: MixinMeta, ctx: commands.Context, messages_list: MessagesList) -> bool:
     # Check if random model is enabled
     random_model_enabled = await cog.config.random_model_enabled()
-    original_client = cog.openai_client
+    client = None
     selected_model_info = None
     
-    try:
-        # If random model is enabled, select a random model
-        if random_model_enabled:
-            random_model = await get_random_model(cog)
-            if random_model:
-                # Get client for the random model's endpoint
-                client = await cog.endpoint_manager.get_client(random_model["endpoint"])
-                if client:
-                    cog.openai_client = client
-                    messages_list.model = random_model["model"]
-                    selected_model_info = random_model
-                    logger.info(f"Using random model: {random_model['name']} via {random_model['endpoint']}")
-        
-        pipeline = LLMPipeline(cog, ctx, messages=messages_list)
-        response = await pipeline.run()
-        if not response:
-            return False
+    # If random model is enabled, select a random model
+    if random_model_enabled:
+        random_model = await get_random_model(cog)
+        if random_model:
+            # Get client for the random model's endpoint
+            client = await cog.endpoint_manager.get_client(random_model["endpoint"])
+            if client:
+                messages_list.model = random_model["model"]
+                selected_model_info = random_model
+                logger.info(f"Using random model: {random_model['name']} via {random_model['endpoint']}")
+    
+    pipeline = LLMPipeline(cog, ctx, messages=messages_list, client=client)
+    response = await pipeline.run()
+    if not response:
+        return False
 
-        cleaned_response = await remove_patterns_from_response(ctx, cog.config, response)
-        if not cleaned_response:
-            return False
+    cleaned_response = await remove_patterns_from_response(ctx, cog.config, response)
+    if not cleaned_response:
+        return False
 
-        # Send normal text response (back to original behavior)
-        message = await send_response(ctx, cleaned_response, messages_list.can_reply)
-        
-        # Add subtle regeneration option and reaction monitoring
-        await add_subtle_regeneration(cog, ctx, message, messages_list, selected_model_info)
-        
-        return True
-        
-    finally:
-        # Restore original client
-        cog.openai_client = original_client
\ No newline at end of file
+    # Attach the subtle regeneration option when sending, then set up reaction monitoring
+    view = await create_regeneration_view(cog, ctx, messages_list, selected_model_info)
+    message = await send_response(ctx, cleaned_response, messages_list.can_reply, view=view)
+    add_subtle_regeneration(cog, message, view, selected_model_info, preview=cleaned_response)
+    
+    return True
\ No newline at end of file
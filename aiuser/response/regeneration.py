@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import random
+import time
 from typing import Dict, List, Optional, Any
 import discord
 from redbot.core import commands, Config
@@ -9,8 +10,7 @@ from redbot.core.bot import Red
 from aiuser.messages_list.messages import MessagesList, create_messages_list
 from aiuser.response.chat.llm_pipeline import LLMPipeline
 from aiuser.types.abc import MixinMeta
-from aiuser.utils.endpoint_manager import EndpointManager
-from aiuser.utils.response_rating import ResponseRating
+from aiuser.types.types import TrackedMessage
 from aiuser.utils.response_utils import remove_patterns_from_response
 
 logger = logging.getLogger("red.bz_cogs.aiuser")
@@ -29,10 +29,19 @@ REACTION_SENTIMENT_MAP = {
     "❓": "confusing"
 }
 
+# Clients may send emojis with or without the U+FE0F variation selector (e.g. ❤️ / ❤)
+REACTION_SENTIMENT_LOOKUP = {emoji.replace("\ufe0f", ""): sentiment for emoji, sentiment in REACTION_SENTIMENT_MAP.items()}
+
+# Minimum seconds between edits of the same regenerated message
+REGENERATION_EDIT_INTERVAL = 1.2
+
+# Oldest tracked messages are dropped past this many entries
+MAX_TRACKED_MESSAGES = 4096
+
 class SubtleRegenerationView(discord.ui.View):
     """Minimal, unobtrusive regeneration UI"""
     
-    def __init__(self, cog: MixinMeta, ctx: commands.Context, original_message: discord.Message, 
+    def __init__(self, cog: MixinMeta, ctx: commands.Context, original_message: Optional[discord.Message], 
                  messages_list: MessagesList, selected_model_info: Dict = None, timeout: float = 300):
         super().__init__(timeout=timeout)
         self.cog = cog
@@ -40,8 +49,9 @@ class SubtleRegenerationView(discord.ui.View):
         self.original_message = original_message
         self.messages_list = messages_list
         self.selected_model_info = selected_model_info
-        self.endpoint_manager = EndpointManager(cog.bot, cog.config)
-        self.rating_system = ResponseRating(cog.config)
+        self.endpoint_manager = cog.endpoint_manager
+        self.rating_system = cog.rating_system
+        self.last_edit_ts = 0.0
         
         # Add a small, subtle regeneration button
         self.add_item(RegenerateButton(self))
@@ -69,11 +79,14 @@ class RegenerateButton(discord.ui.Button):
     
     async def callback(self, interaction: discord.Interaction):
         """Handle regeneration request"""
+        # Acknowledge first, Discord invalidates interactions not answered within 3 seconds
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        
         # Show dropdown for model selection
         available_models = await self.parent_view.endpoint_manager.get_available_models()
         
         if not available_models:
-            await interaction.response.send_message("❌ No alternative models available", ephemeral=True)
+            await interaction.followup.send("❌ No alternative models available", ephemeral=True)
             return
         
         if len(available_models) == 1:
@@ -82,83 +95,70 @@ class RegenerateButton(discord.ui.Button):
         else:
             # Show selection dropdown
             view = ModelSelectionView(self.parent_view, available_models)
-            await interaction.response.send_message("Choose a model:", view=view, ephemeral=True)
+            await interaction.followup.send("Choose a model:", view=view, ephemeral=True)
 
     async def _regenerate_with_model(self, model_config: Dict[str, Any], interaction: discord.Interaction):
-        """Actually regenerate with the specified model using full aiuser pipeline"""
+        """Actually regenerate with the specified model using full aiuser pipeline
+        
+        The interaction must already be deferred by the calling callback.
+        """
         try:
-            # Acknowledge the interaction immediately to prevent timeout
-            if not interaction.response.is_done():
-                await interaction.response.defer(ephemeral=True)
-            
             # Get the appropriate client for this endpoint  
             client = await self.parent_view.endpoint_manager.get_client(model_config["endpoint"])
             if not client:
                 await interaction.followup.send("❌ Failed to connect to endpoint", ephemeral=True)
                 return
             
-            # Store original client and model to restore later
-            original_client = self.parent_view.cog.openai_client
-            original_model = self.parent_view.messages_list.model
+            semaphore = self.parent_view.cog.regeneration_semaphore
+            if semaphore.locked():
+                await interaction.followup.send("⏳ Waiting for other regenerations to finish...", ephemeral=True)
             
-            try:
-                # Switch to the new model and client
-                self.parent_view.cog.openai_client = client
-                self.parent_view.messages_list.model = model_config["model"]
-                
-                # Use the full aiuser pipeline system
-                pipeline = LLMPipeline(self.parent_view.cog, self.parent_view.ctx, self.parent_view.messages_list)
+            # Use the full aiuser pipeline system with the selected model and client
+            async with semaphore:
+                pipeline = LLMPipeline(
+                    self.parent_view.cog, self.parent_view.ctx, self.parent_view.messages_list,
+                    client=client, model=model_config["model"]
+                )
                 response = await pipeline.run()
+            
+            if response:
+                # Clean the response using the same system as normal responses
+                cleaned_response = await remove_patterns_from_response(
+                    self.parent_view.ctx, self.parent_view.cog.config, response
+                )
                 
-                if response:
-                    # Clean the response using the same system as normal responses
-                    cleaned_response = await remove_patterns_from_response(
-                        self.parent_view.ctx, self.parent_view.cog.config, response
+                if cleaned_response:
+                    # Update the original message with new response, truncated to fit the attribution
+                    model_attribution = f"\n\n*— {model_config['name']}*"
+                    budget = 2000 - len(model_attribution)
+                    if len(cleaned_response) > budget:
+                        cleaned_response = cleaned_response[:budget - 3] + "..."
+                    new_content = cleaned_response + model_attribution
+                    
+                    # Space out edits so repeated clicks don't run into the channel's edit rate limit
+                    now = time.monotonic()
+                    edit_at = max(now, self.parent_view.last_edit_ts + REGENERATION_EDIT_INTERVAL)
+                    self.parent_view.last_edit_ts = edit_at
+                    if edit_at > now:
+                        await asyncio.sleep(edit_at - now)
+                    await self.parent_view.original_message.edit(content=new_content)
+                    
+                    # Keep the existing view, just track the model now in use
+                    self.parent_view.selected_model_info = model_config
+                    setup_reaction_monitoring(
+                        self.parent_view.cog, self.parent_view.original_message, model_config, cleaned_response
                     )
                     
-                    if cleaned_response:
-                        # Update the original message with new response
-                        model_attribution = f"\n\n*— {model_config['name']}*"
-                        new_content = cleaned_response + model_attribution
-                        
-                        # Truncate if too long
-                        if len(new_content) > 2000:
-                            new_content = cleaned_response[:1950] + "..." + model_attribution
-                        
-                        await self.parent_view.original_message.edit(content=new_content)
-                        
-                        # Update the selected model info and recreate view with updated model selection
-                        self.parent_view.selected_model_info = model_config
-                        
-                        # Create new view with updated model selection
-                        new_view = SubtleRegenerationView(
-                            self.parent_view.cog, 
-                            self.parent_view.ctx, 
-                            self.parent_view.original_message,
-                            self.parent_view.messages_list, 
-                            model_config,
-                            timeout=300
-                        )
-                        await self.parent_view.original_message.edit(view=new_view)
-                        
-                        await interaction.followup.send(f"✅ Regenerated with {model_config['name']}", ephemeral=True)
-                    else:
-                        await interaction.followup.send("❌ Response was filtered out", ephemeral=True)
+                    await interaction.followup.send(f"✅ Regenerated with {model_config['name']}", ephemeral=True)
                 else:
-                    await interaction.followup.send("❌ Failed to generate response", ephemeral=True)
-                    
-            finally:
-                # Always restore original client and model
-                self.parent_view.cog.openai_client = original_client
-                self.parent_view.messages_list.model = original_model
+                    await interaction.followup.send("❌ Response was filtered out", ephemeral=True)
+            else:
+                await interaction.followup.send("❌ Failed to generate response", ephemeral=True)
                 
         except Exception as e:
             logger.error(f"Failed to regenerate response: {e}", exc_info=True)
             try:
-                if interaction.response.is_done():
-                    await interaction.followup.send("❌ An error occurred during regeneration", ephemeral=True)
-                else:
-                    await interaction.response.send_message("❌ An error occurred during regeneration", ephemeral=True)
+                await interaction.followup.send("❌ An error occurred during regeneration", ephemeral=True)
             except:
                 pass  # Interaction may have timed out
 
@@ -176,6 +176,7 @@ class ModelSelectionDropdown(discord.ui.Select):
     def __init__(self, parent_view: ModelSelectionView, available_models: List[Dict]):
         self.parent_view = parent_view
         self.available_models = available_models
+        self.available_models_by_name = {model["name"]: model for model in available_models}
         
         # Get the currently used model info to mark it as default
         current_model_info = self.parent_view.parent_view.selected_model_info
@@ -214,41 +215,32 @@ class ModelSelectionDropdown(discord.ui.Select):
     
     async def callback(self, interaction: discord.Interaction):
         """Handle model selection"""
-        selected_name = self.values[0]
-        selected_model = None
+        await interaction.response.defer(ephemeral=True, thinking=True)
         
-        for model in self.available_models:
-            if model["name"] == selected_name:
-                selected_model = model
-                break
+        selected_model = self.available_models_by_name.get(self.values[0])
         
         if selected_model:
             # Get the regenerate button from the original view
             regen_button = self.parent_view.parent_view.children[0]
             await regen_button._regenerate_with_model(selected_model, interaction)
         else:
-            await interaction.response.send_message("❌ Model not found", ephemeral=True)
+            await interaction.followup.send("❌ Model not found", ephemeral=True)
 
-async def add_subtle_regeneration(cog: MixinMeta, ctx: commands.Context, 
-                                message: discord.Message, messages_list: MessagesList, 
-                                selected_model_info: Dict = None) -> discord.Message:
-    """Add subtle regeneration controls and reaction monitoring to a message"""
+async def create_regeneration_view(cog: MixinMeta, ctx: commands.Context, messages_list: MessagesList,
+                                   selected_model_info: Dict = None) -> Optional[SubtleRegenerationView]:
+    """Build the subtle regeneration controls so they can be attached when the response is sent"""
     try:
         # First check if we have necessary models configured
-        regen_models = await cog.config.regen_models()
+        regen_models = await cog.endpoint_manager.get_regen_models()
         if not regen_models:
             logger.info("No regeneration models configured, skipping regeneration view")
-            await setup_reaction_monitoring(cog, message, selected_model_info)
-            return message
+            return None
         
         # If no selected_model_info provided, try to determine the current model
         if not selected_model_info:
             # Try to find a matching model from regen_models based on the current model
             current_model = messages_list.model
-            for model_config in regen_models:
-                if model_config["model"] == current_model:
-                    selected_model_info = model_config
-                    break
+            selected_model_info = await cog.endpoint_manager.find_regen_model(current_model)
             
             # If still no match, create a basic model info for the current model
             if not selected_model_info:
@@ -259,32 +251,45 @@ async def add_subtle_regeneration(cog: MixinMeta, ctx: commands.Context,
                     "default": False
                 }
         
-        # Add the subtle regeneration view (small button)
-        view = SubtleRegenerationView(cog, ctx, message, messages_list, selected_model_info)
+        # The message is bound once it has been sent
+        return SubtleRegenerationView(cog, ctx, None, messages_list, selected_model_info)
         
-        # Edit the message with the view
-        edited_message = await message.edit(view=view)
+    except Exception as e:
+        logger.error(f"Failed to create regeneration view: {e}", exc_info=True)
+        return None
+
+def add_subtle_regeneration(cog: MixinMeta, message: discord.Message,
+                            view: Optional[SubtleRegenerationView] = None,
+                            selected_model_info: Dict = None, preview: Optional[str] = None) -> discord.Message:
+    """Bind regeneration controls and set up reaction monitoring for a sent message"""
+    try:
+        if view:
+            view.original_message = message
+            selected_model_info = view.selected_model_info
         
         # Set up reaction monitoring for sentiment tracking
-        await setup_reaction_monitoring(cog, message, selected_model_info)
+        setup_reaction_monitoring(cog, message, selected_model_info, preview)
         
-        return edited_message
+        return message
         
     except Exception as e:
         logger.error(f"Failed to add subtle regeneration: {e}", exc_info=True)
         return message
 
-async def setup_reaction_monitoring(cog: MixinMeta, message: discord.Message, 
-                                   selected_model_info: Dict = None):
-    """Set up monitoring for Discord reactions to track sentiment"""
+def track_message(cog: MixinMeta, message_id: int, info: TrackedMessage):
+    """Track a message for reactions, evicting the least recently tracked past the limit"""
+    cog.tracked_messages[message_id] = info
+    cog.tracked_messages.move_to_end(message_id)
+    while len(cog.tracked_messages) > MAX_TRACKED_MESSAGES:
+        cog.tracked_messages.popitem(last=False)
+
+def setup_reaction_monitoring(cog: MixinMeta, message: discord.Message, 
+                              selected_model_info: Dict = None, preview: Optional[str] = None):
+    """Set up monitoring for Discord reactions to track sentiment
+    
+    `preview` is the generated text, used instead of re-reading the message content.
+    """
     try:
-        # Store message info for reaction tracking
-        rating_system = ResponseRating(cog.config)
-        
-        # Store the message info in bot's memory for reaction tracking
-        if not hasattr(cog, 'tracked_messages'):
-            cog.tracked_messages = {}
-        
         model_name = "Unknown"
         endpoint_name = "Unknown"
         
@@ -296,13 +301,12 @@ async def setup_reaction_monitoring(cog: MixinMeta, message: discord.Message,
             model_name = "Default"
             endpoint_name = "Default"
         
-        cog.tracked_messages[message.id] = {
-            "model": model_name,
-            "endpoint": endpoint_name,
-            "content": message.content[:500] if message.content else None,
-            "guild_id": message.guild.id,
-            "rating_system": rating_system
-        }
+        track_message(cog, message.id, TrackedMessage(
+            model=model_name,
+            endpoint=endpoint_name,
+            content=(preview or message.content or "")[:500] or None,
+            guild_id=message.guild.id,
+        ))
         
         logger.debug(f"Set up reaction monitoring for message {message.id}")
         
@@ -312,9 +316,7 @@ async def setup_reaction_monitoring(cog: MixinMeta, message: discord.Message,
 async def handle_reaction_add(cog: MixinMeta, payload: discord.RawReactionActionEvent):
     """Handle reaction additions for sentiment tracking"""
     try:
-        if not hasattr(cog, 'tracked_messages'):
-            return
-        
+        # Cheapest check first, this runs for every reaction the bot can see
         message_id = payload.message_id
         if message_id not in cog.tracked_messages:
             return
@@ -323,23 +325,26 @@ async def handle_reaction_add(cog: MixinMeta, payload: discord.RawReactionAction
         if payload.user_id == cog.bot.user.id:
             return
         
-        emoji_str = str(payload.emoji)
-        if emoji_str not in REACTION_SENTIMENT_MAP:
+        # Only unicode emojis are rated; their name is already the emoji string
+        if payload.emoji.id is not None:
+            return
+        emoji_str = payload.emoji.name.replace("\ufe0f", "")
+        sentiment = REACTION_SENTIMENT_LOOKUP.get(emoji_str)
+        if not sentiment:
             return
         
         message_info = cog.tracked_messages[message_id]
-        sentiment = REACTION_SENTIMENT_MAP[emoji_str]
         
         # Log the reaction as a rating
         rating_key = f"{message_id}_{payload.user_id}_{emoji_str}"
-        await message_info["rating_system"].log_rating(
+        cog.rating_system.queue_rating(
             message_id=rating_key,
             user_id=payload.user_id,
-            guild_id=message_info["guild_id"],
-            model=message_info["model"],
-            endpoint=message_info["endpoint"],
+            guild_id=message_info.guild_id,
+            model=message_info.model,
+            endpoint=message_info.endpoint,
             rating=sentiment,
-            response_content=message_info["content"]
+            response_content=message_info.content
         )
         
         logger.debug(f"Logged reaction {emoji_str} ({sentiment}) from user {payload.user_id} on message {message_id}")
@@ -350,8 +355,7 @@ async def handle_reaction_add(cog: MixinMeta, payload: discord.RawReactionAction
 async def get_random_model(cog: MixinMeta) -> Optional[Dict[str, Any]]:
     """Get a random model from available regeneration models"""
     try:
-        endpoint_manager = EndpointManager(cog.bot, cog.config)
-        available_models = await endpoint_manager.get_available_models()
+        available_models = await cog.endpoint_manager.get_available_models()
         
         if available_models:
             return random.choice(available_models)
@@ -15,6 +15,7 @@ from aiuser.core.openai_utils import setup_openai_client
 from aiuser.settings.utilities import get_tokens, truncate_prompt
 from aiuser.types.abc import MixinMeta
 from aiuser.types.enums import ScanImageMode
+from aiuser.utils.response_utils import clear_pattern_cache, re2
 from aiuser.utils.utilities import (
     is_using_openai_endpoint,
     is_using_openrouter_endpoint,
@@ -184,6 +185,7 @@ class OwnerSettings(MixinMeta):
 
         await self.config.openai_endpoint_request_timeout.set(seconds)
         await self.initialize_openai_client()
+        self.endpoint_manager.reset_clients()
 
         embed = discord.Embed(
             title="The request timeout is now:",
@@ -192,6 +194,25 @@ class OwnerSettings(MixinMeta):
         )
         return await ctx.send(embed=embed)
 
+    @aiuserowner.command(name="fastregex")
+    async def fast_regex(self, ctx: commands.Context):
+        """ Toggles using the linear-time RE2 engine for removelist patterns
+
+            Requires the optional `google-re2` package (see cog README).
+            Patterns RE2 does not support (eg. lookarounds, backreferences) still use Python's `re`.
+        """
+        value = not (await self.config.removelist_fast_regex())
+        if value and not re2:
+            return await ctx.send(":warning: `google-re2` is not installed, see cog README for instructions")
+        await self.config.removelist_fast_regex.set(value)
+        clear_pattern_cache()
+        embed = discord.Embed(
+            title="Using RE2 for removelist patterns:",
+            description=f"{value}",
+            color=await ctx.embed_color(),
+        )
+        return await ctx.send(embed=embed)
+
     @aiuserowner.command(name="exportconfig")
     async def export_config(self, ctx: commands.Context):
         """Exports the current config to a json file
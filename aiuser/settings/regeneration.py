@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 from typing import List, Dict, Any
@@ -102,10 +103,11 @@ class RegenerationSettings(MixinMeta):
                 return
             
             regen_models = await self.config.regen_models()
+            name_lc = name.lower()
             
             # Check if model with same name already exists
             for existing_model in regen_models:
-                if existing_model.get("name", "").lower() == name.lower():
+                if existing_model.get("name", "").lower() == name_lc:
                     await ctx.send(f"❌ Model with name '{name}' already exists.")
                     return
             
@@ -124,6 +126,7 @@ class RegenerationSettings(MixinMeta):
             
             regen_models.append(new_model)
             await self.config.regen_models.set(regen_models)
+            self.endpoint_manager.invalidate_models_cache()
             
             default_text = " (set as default)" if default else ""
             await ctx.send(f"✅ Added regeneration model '{name}'{default_text}")
@@ -137,11 +140,12 @@ class RegenerationSettings(MixinMeta):
         """Remove a regeneration model by name"""
         try:
             regen_models = await self.config.regen_models()
+            name_lc = name.lower()
             
             # Find and remove the model
             model_found = False
             for i, model in enumerate(regen_models):
-                if model.get("name", "").lower() == name.lower():
+                if model.get("name", "").lower() == name_lc:
                     removed_model = regen_models.pop(i)
                     model_found = True
                     break
@@ -151,6 +155,7 @@ class RegenerationSettings(MixinMeta):
                 return
             
             await self.config.regen_models.set(regen_models)
+            self.endpoint_manager.invalidate_models_cache()
             await ctx.send(f"✅ Removed regeneration model '{name}'")
             
         except Exception as e:
@@ -162,11 +167,12 @@ class RegenerationSettings(MixinMeta):
         """Set a model as the default regeneration model"""
         try:
             regen_models = await self.config.regen_models()
+            name_lc = name.lower()
             
             # Find the model and set as default
             model_found = False
             for model in regen_models:
-                if model.get("name", "").lower() == name.lower():
+                if model.get("name", "").lower() == name_lc:
                     model["default"] = True
                     model_found = True
                 else:
@@ -177,6 +183,7 @@ class RegenerationSettings(MixinMeta):
                 return
             
             await self.config.regen_models.set(regen_models)
+            self.endpoint_manager.invalidate_models_cache()
             await ctx.send(f"✅ Set '{name}' as default regeneration model")
             
         except Exception as e:
@@ -208,8 +215,13 @@ class RegenerationSettings(MixinMeta):
     async def regen_stats(self, ctx):
         """Show regeneration and rating statistics"""
         try:
-            # Get rating statistics
-            stats = await self.rating_system.get_model_stats()
+            # Get overall and model-specific rating statistics together
+            regen_models = await self.config.regen_models()
+            stats, *models_stats = await asyncio.gather(
+                self.rating_system.get_model_stats(),
+                *(self.rating_system.get_model_stats(model=model['name'], endpoint=model['endpoint'])
+                  for model in regen_models)
+            )
             
             embed = discord.Embed(
                 title="Regeneration Statistics",
@@ -222,13 +234,7 @@ class RegenerationSettings(MixinMeta):
                 inline=True
             )
             
-            # Get model-specific stats
-            regen_models = await self.config.regen_models()
-            for model in regen_models:
-                model_stats = await self.rating_system.get_model_stats(
-                    model=model['name'], 
-                    endpoint=model['endpoint']
-                )
+            for model, model_stats in zip(regen_models, models_stats):
                 if model_stats['total'] > 0:
                     embed.add_field(
                         name=f"{model['name']}",
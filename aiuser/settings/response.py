@@ -1,10 +1,11 @@
 import asyncio
+import functools
 import json
 import logging
 import re
+from typing import TYPE_CHECKING
 
 import discord
-import tiktoken
 from redbot.core import checks, commands
 from redbot.core.utils.chat_formatting import box, pagify
 from redbot.core.utils.menus import SimpleMenu, start_adding_reactions
@@ -12,10 +13,27 @@ from redbot.core.utils.predicates import ReactionPredicate
 
 from aiuser.config.defaults import DEFAULT_REMOVE_PATTERNS
 from aiuser.types.abc import MixinMeta, aiuser
+from aiuser.utils.response_utils import clear_pattern_cache
+from aiuser.utils.utilities import (
+    get_custom_parameters,
+    get_weights,
+    json_dumps,
+    json_loads,
+)
+
+if TYPE_CHECKING:
+    import tiktoken
 
 logger = logging.getLogger("red.bz_cogs.aiuser")
 
 
+@functools.lru_cache(maxsize=16)
+def _enc_for(model: str) -> "tiktoken.Encoding":
+    # tiktoken is imported where it's used, not at module level, to keep cog load light
+    import tiktoken
+    return tiktoken.encoding_for_model(model)
+
+
 class ResponseSettings(MixinMeta):
 
     @aiuser.group(name="response")
@@ -103,6 +121,7 @@ class ResponseSettings(MixinMeta):
         if regex_pattern not in removelist_regexes:
             removelist_regexes.append(regex_pattern)
             await self.config.guild(ctx.guild).removelist_regexes.set(removelist_regexes)
+            clear_pattern_cache()
             await ctx.send(f"The regex pattern `{regex_pattern}` has been added to the list.")
         else:
             await ctx.send(f"The regex pattern `{regex_pattern}` is already in the list of regex patterns.")
@@ -121,6 +140,7 @@ class ResponseSettings(MixinMeta):
             return await ctx.send("Invalid number.")
         removed_regex = removelist_regexes.pop(number - 1)
         await self.config.guild(ctx.guild).removelist_regexes.set(removelist_regexes)
+        clear_pattern_cache()
         await ctx.send(f"The regex pattern `{removed_regex}` has been removed from the list.")
 
     @removelist.command(name="show")
@@ -134,22 +154,23 @@ class ResponseSettings(MixinMeta):
         if not removelist_regexes:
             return await ctx.send("The list of regex patterns is empty.")
 
-        pages = []
-
         formatted_list = [f"{i+1}. {pattern}" for i, pattern in enumerate(removelist_regexes)]
         formatted_list = "\n".join(formatted_list)
-        for text in pagify(formatted_list, page_length=888):
-            page = discord.Embed(
-                title=f"List of regexes patterns to remove in bot responses in {ctx.guild.name}",
-                description=box(text),
-                color=await ctx.embed_color())
-            pages.append(page)
+        texts = list(pagify(formatted_list, page_length=888))
+        title = f"List of regexes patterns to remove in bot responses in {ctx.guild.name}"
+        color = await ctx.embed_color()
+        pages = [
+            discord.Embed(title=title, description=box(text), color=color)
+            .set_footer(text=f"Page {i+1} of {len(texts)}")
+            for i, text in enumerate(texts)
+        ]
 
         if len(pages) == 1:
-            return await ctx.send(embed=pages[0])
+            return await ctx.send(embed=pages[0].remove_footer())
 
-        for i, page in enumerate(pages):
-            page.set_footer(text=f"Page {i+1} of {len(pages)}")
+        # send everything at once when it fits within a single message's embed limits
+        if len(pages) <= 10 and sum(len(page) for page in pages) <= 6000:
+            return await ctx.send(embeds=pages)
 
         return await SimpleMenu(pages).start(ctx)
 
@@ -177,6 +198,7 @@ class ResponseSettings(MixinMeta):
             return await confirm.edit(embed=discord.Embed(title="Cancelled.", color=await ctx.embed_color()))
         else:
             await self.config.guild(ctx.guild).removelist_regexes.set(DEFAULT_REMOVE_PATTERNS)
+            clear_pattern_cache()
             return await confirm.edit(embed=discord.Embed(title="Removelist reset.", color=await ctx.embed_color()))
 
     @response.command(name="toggleoptinembed")
@@ -213,13 +235,12 @@ class ResponseSettings(MixinMeta):
         """
             Show weights
         """
-        weights = await self.config.guild(ctx.guild).weights()
-        weights = {} if weights is None else json.loads(weights)
+        weights = await get_weights(self, ctx.guild)
         if not weights:
             return await ctx.send(":warning: No weights set.")
         embed = discord.Embed(title="Weights Used", color=await ctx.embed_color())
         try:
-            encoding = tiktoken.encoding_for_model(await self.config.guild(ctx.guild).model())
+            encoding = _enc_for(await self.config.guild(ctx.guild).model())
         except KeyError:
             return await ctx.send(":warning: Unsupported model for tokenization")
         weights = {encoding.decode([int(token)]): weight for token, weight in weights.items()}
@@ -241,15 +262,13 @@ class ResponseSettings(MixinMeta):
             - `weight` The weight to set (`-100` to `100`)
         """
 
-        custom_parameters = await self.config.guild(ctx.guild).parameters()
-        if custom_parameters:
-            custom_parameters = json.loads(custom_parameters)
-            if custom_parameters.get("logit_bias"):
-                return await ctx.send(":warning: Logit bias already set. Please remove logit bias from custom parameters first.")
+        custom_parameters = await get_custom_parameters(self, ctx.guild)
+        if custom_parameters.get("logit_bias"):
+            return await ctx.send(":warning: Logit bias already set. Please remove logit bias from custom parameters first.")
 
         model = await self.config.guild(ctx.guild).model()
         try:
-            encoding = tiktoken.encoding_for_model(model)
+            encoding = _enc_for(model)
         except KeyError:
             return await ctx.send(":warning: Unsupported model, please use custom parameters instead.")
 
@@ -275,11 +294,11 @@ class ResponseSettings(MixinMeta):
             return await ctx.send(embed=embed)
         else:
             tokens = await self.get_all_tokens(word, encoding)
-            weights = await self.config.guild(ctx.guild).weights()
-            weights = {} if weights is None else json.loads(weights)
+            weights = await get_weights(self, ctx.guild)
             for token in tokens:
                 weights[token] = weight
-            await self.config.guild(ctx.guild).weights.set(json.dumps(weights))
+            await self.config.guild(ctx.guild).weights.set(json_dumps(weights))
+            self.cached_weights.pop(ctx.guild.id, None)
             embed = discord.Embed(
                 title=f"Weight for `{word}` set to `{weight}`",
                 color=await ctx.embed_color()
@@ -295,11 +314,10 @@ class ResponseSettings(MixinMeta):
             - `word` The word to remove
         """
         try:
-            encoding = tiktoken.encoding_for_model(await self.config.guild(ctx.guild).model())
+            encoding = _enc_for(await self.config.guild(ctx.guild).model())
         except KeyError:
             return await ctx.send(":warning: Unsupported model for tokenization")
-        weights = await self.config.guild(ctx.guild).weights()
-        weights = {} if weights is None else json.loads(weights)
+        weights = await get_weights(self, ctx.guild)
 
         token = encoding.encode(word)
         if len(token) == 1:
@@ -311,33 +329,29 @@ class ResponseSettings(MixinMeta):
         tokens = await self.get_all_tokens(word, encoding)
         for token in tokens:
             weights.pop(str(token))
-        await self.config.guild(ctx.guild).weights.set(json.dumps(weights))
+        await self.config.guild(ctx.guild).weights.set(json_dumps(weights))
+        self.cached_weights.pop(ctx.guild.id, None)
         embed = discord.Embed(
             title=f"Weight for `{word}` removed.",
             color=await ctx.embed_color()
         )
         return await ctx.send(embed=embed)
 
-    async def get_all_tokens(self, word: str, encoding: tiktoken.Encoding):
+    async def get_all_tokens(self, word: str, encoding: "tiktoken.Encoding"):
         """
             Returns all possible tokens for a word
         """
-        tokens = set()
-
-        def append_token_if_single(token):
-            encoded_token = encoding.encode(token)
-            if len(encoded_token) == 1:
-                tokens.add(encoded_token[0])
-
-        append_token_if_single(word)
-        append_token_if_single(word.lower())
-        append_token_if_single(word.upper())
-        append_token_if_single(word.capitalize())
-        append_token_if_single(" " + word)
-        append_token_if_single(" " + word.lower())
-        append_token_if_single(" " + word.capitalize())
-        append_token_if_single(" " + word.upper())
-        return list(tokens)
+        variants = [
+            word,
+            word.lower(),
+            word.upper(),
+            word.capitalize(),
+            " " + word,
+            " " + word.lower(),
+            " " + word.capitalize(),
+            " " + word.upper(),
+        ]
+        return list({tokens[0] for variant in variants if len(tokens := encoding.encode(variant)) == 1})
 
     @response.command(name="parameters")
     @checks.is_owner()
@@ -355,20 +369,20 @@ class ResponseSettings(MixinMeta):
         """
         if json_block in ['reset', 'clear']:
             await self.config.guild(ctx.guild).parameters.set(None)
+            self.cached_parameters.pop(ctx.guild.id, None)
             return await ctx.send("Parameters reset to default")
 
         embed = discord.Embed(title="Custom Parameters", color=await ctx.embed_color())
-        parameters = await self.config.guild(ctx.guild).parameters()
-        data = {} if parameters is None else json.loads(parameters)
-
-        if json_block not in ['show', 'list']:
+        if json_block in ['show', 'list']:
+            data = await get_custom_parameters(self, ctx.guild)
+        else:
             if not json_block.startswith("```"):
                 return await ctx.send(":warning: Please use a code block (`` eg. ```json ``)")
 
             json_block = json_block.replace("```json", "").replace("```", "")
 
             try:
-                data = json.loads(json_block)
+                data = json_loads(json_block)
             except json.JSONDecodeError:
                 return await ctx.channel.send(":warning: Invalid JSON format!")
 
@@ -379,7 +393,7 @@ class ResponseSettings(MixinMeta):
                 invalid_keys_str = ", ".join([f"`{key}`" for key in invalid_keys])
                 return await ctx.send(f":warning: Invalid JSON! Please remove \"{invalid_keys_str}\" key from your JSON.")
 
-            if data.get("logit_bias") and await self.config(ctx.guild).weights():
+            if data.get("logit_bias") and await get_weights(self, ctx.guild):
                 embed = discord.Embed(
                     title="Existing logit bias found!",
                     description="Wipe existing logit bias (from [p]aiuser response weights)?",
@@ -394,10 +408,12 @@ class ResponseSettings(MixinMeta):
                 if pred.result is True:
                     await confirm.edit(content="Overwritten existing weights.")
                     await self.config.guild(ctx.guild).weights.set(None)
+                    self.cached_weights.pop(ctx.guild.id, None)
                 else:
                     return await confirm.edit(content="Canceled.")
 
-            await self.config.guild(ctx.guild).parameters.set(json.dumps(data))
+            await self.config.guild(ctx.guild).parameters.set(json_dumps(data))
+            self.cached_parameters.pop(ctx.guild.id, None)
 
         if not data:
             embed.description = "No custom parameters set."
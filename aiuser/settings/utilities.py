@@ -1,5 +1,4 @@
 import discord
-import tiktoken
 from openai import AsyncOpenAI
 from redbot.core import Config, commands
 
@@ -57,6 +56,7 @@ async def get_tokens(config: Config, ctx: commands.Context, prompt: str) -> int:
     if not prompt:
         return 0
     prompt = await format_variables(ctx, prompt)  # to provide a better estimate
+    import tiktoken
     try:
         encoding = tiktoken.encoding_for_model(await config.guild(ctx.guild).model())
     except KeyError:
@@ -1,5 +1,7 @@
+import asyncio
 import re
 from abc import ABC
+from collections import OrderedDict
 from datetime import datetime
 
 from openai import AsyncOpenAI
@@ -7,7 +9,10 @@ from redbot.core import Config, commands
 from redbot.core.bot import Red
 
 from aiuser.messages_list.entry import MessageEntry
+from aiuser.types.types import TrackedMessage
 from aiuser.utils.cache import Cache
+from aiuser.utils.endpoint_manager import EndpointManager
+from aiuser.utils.response_rating import ResponseRating
 
 
 # for other settings to use
@@ -30,6 +35,12 @@ class MixinMeta(ABC):
         self.override_prompt_start_time: dict[int, datetime]
         self.cached_messages: Cache[int, MessageEntry]
         self.ignore_regex: dict[int, re.Pattern]
+        self.cached_parameters: dict[int, dict]
+        self.cached_weights: dict[int, dict]
         self.channels_whitelist: dict[int, list[int]]
         self.openai_client: AsyncOpenAI
-        self.optindefault: dict[int, bool] 
\ No newline at end of file
+        self.optindefault: dict[int, bool]
+        self.endpoint_manager: EndpointManager
+        self.rating_system: ResponseRating
+        self.regeneration_semaphore: asyncio.Semaphore
+        self.tracked_messages: OrderedDict[int, TrackedMessage]
\ No newline at end of file
@@ -1,6 +1,16 @@
-from typing import Union
+from dataclasses import dataclass
+from typing import Optional, Union
 
 import discord
 
 COMPATIBLE_CHANNELS = Union[discord.TextChannel, discord.VoiceChannel, discord.StageChannel, discord.ForumChannel]
 COMPATIBLE_MENTIONS = Union[discord.Member, discord.Role, COMPATIBLE_CHANNELS]
+
+
+@dataclass(frozen=True)
+class TrackedMessage:
+    __slots__ = ("model", "endpoint", "content", "guild_id")
+    model: str
+    endpoint: str
+    content: Optional[str]
+    guild_id: int
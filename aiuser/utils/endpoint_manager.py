@@ -1,11 +1,15 @@
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+import time
+from typing import Dict, List, Optional, Any, Tuple
 from openai import AsyncOpenAI
 from redbot.core import Config
 from redbot.core.bot import Red
 
 logger = logging.getLogger("red.bz_cogs.aiuser")
 
+AVAILABLE_MODELS_TTL = 30
+
 class EndpointManager:
     """Manages multiple AI endpoints and their configurations"""
     
@@ -13,6 +17,11 @@ class EndpointManager:
         self.bot = bot
         self.config = config
         self.clients: Dict[str, AsyncOpenAI] = {}
+        # endpoints reaching the same backend share one client (and connection pool)
+        self._by_conn: Dict[Tuple[Optional[str], str], AsyncOpenAI] = {}
+        self._models_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+        self._regen_models: Optional[List[Dict[str, Any]]] = None
+        self._regen_models_by_model: Dict[str, Dict[str, Any]] = {}
         
     async def get_client(self, endpoint: str) -> Optional[AsyncOpenAI]:
         """Get or create client for specified endpoint"""
@@ -33,10 +42,7 @@ class EndpointManager:
                     logger.warning("OpenAI API key not found")
                     return None
                     
-                return AsyncOpenAI(
-                    api_key=api_key,
-                    timeout=await self.config.openai_endpoint_request_timeout()
-                )
+                return await self._shared_client(api_key)
                 
             elif endpoint == "openrouter":
                 api_key = (await self.bot.get_shared_api_tokens("openrouter")).get("api_key")
@@ -44,11 +50,7 @@ class EndpointManager:
                     logger.warning("OpenRouter API key not found")
                     return None
                     
-                return AsyncOpenAI(
-                    api_key=api_key,
-                    base_url="https://openrouter.ai/api/v1",
-                    timeout=await self.config.openai_endpoint_request_timeout()
-                )
+                return await self._shared_client(api_key, base_url="https://openrouter.ai/api/v1")
                 
             else:
                 logger.warning(f"Unknown endpoint: {endpoint}")
@@ -58,21 +60,53 @@ class EndpointManager:
             logger.error(f"Failed to create client for {endpoint}: {e}")
             return None
     
+    async def _shared_client(self, api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+        # read before checking, so concurrent callers can't both miss and create a client
+        timeout = await self.config.openai_endpoint_request_timeout()
+        conn_key = (base_url, api_key)
+        if conn_key not in self._by_conn:
+            self._by_conn[conn_key] = AsyncOpenAI(api_key=api_key, base_url=base_url, timeout=timeout)
+        return self._by_conn[conn_key]
+    
+    async def get_regen_models(self) -> List[Dict[str, Any]]:
+        """Get configured regeneration models, cached until invalidated"""
+        if self._regen_models is None:
+            regen_models = await self.config.regen_models()
+            # first configured entry wins when several share a model id
+            self._regen_models_by_model = {}
+            for model_config in regen_models:
+                self._regen_models_by_model.setdefault(model_config["model"], model_config)
+            self._regen_models = regen_models
+        return self._regen_models
+
+    async def find_regen_model(self, model: str) -> Optional[Dict[str, Any]]:
+        """Get the configured regeneration model using the given model id"""
+        await self.get_regen_models()
+        return self._regen_models_by_model.get(model)
+
     async def get_available_models(self) -> List[Dict[str, Any]]:
         """Get list of available regeneration models"""
-        regen_models = await self.config.regen_models()
-        available = []
-        
-        for model_config in regen_models:
-            client = await self.get_client(model_config["endpoint"])
-            if client:
-                available.append(model_config)
-                
+        now = time.monotonic()
+        if self._models_cache and self._models_cache[0] > now:
+            return self._models_cache[1]
+
+        regen_models = await self.get_regen_models()
+        # resolve each distinct endpoint once, concurrently
+        endpoints = list(dict.fromkeys(m["endpoint"] for m in regen_models))
+        clients = dict(zip(endpoints, await asyncio.gather(*(self.get_client(e) for e in endpoints))))
+        available = [m for m in regen_models if clients[m["endpoint"]]]
+
+        self._models_cache = (now + AVAILABLE_MODELS_TTL, available)
         return available
+
+    def invalidate_models_cache(self):
+        """Drop the cached models so the next lookup re-reads config"""
+        self._models_cache = None
+        self._regen_models = None
     
     async def get_default_model(self) -> Optional[Dict[str, Any]]:
         """Get the default regeneration model"""
-        regen_models = await self.config.regen_models()
+        regen_models = await self.get_regen_models()
         for model_config in regen_models:
             if model_config.get("default", False):
                 client = await self.get_client(model_config["endpoint"])
@@ -80,9 +114,19 @@ class EndpointManager:
                     return model_config
         return None
     
+    def reset_clients(self):
+        """Drop all endpoint clients so they are rebuilt on next use
+        
+        In-flight requests may still hold the old clients, so they are left to be garbage collected instead of closed.
+        """
+        self.clients = {}
+        self._by_conn = {}
+        self._models_cache = None
+    
     async def close_all_clients(self):
         """Close all endpoint clients"""
-        for client in self.clients.values():
-            if client:
-                await client.close()
-        self.clients.clear()
\ No newline at end of file
+        for client in self._by_conn.values():
+            await client.close()
+        self._by_conn.clear()
+        self.clients.clear()
+        self._models_cache = None
\ No newline at end of file
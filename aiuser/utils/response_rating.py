@@ -1,40 +1,139 @@
+import asyncio
 import logging
-import json
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from redbot.core import Config
 
 logger = logging.getLogger("red.bz_cogs.aiuser")
 
+RATING_BATCH_SIZE = 32
+RATING_FLUSH_INTERVAL = 0.25
+RATINGS = ("thumbs_up", "thumbs_down")
+
+def _stats_key(model: str, endpoint: str) -> str:
+    return f"{model}|{endpoint}"
+
+def _count_rating(deltas: Dict[str, Dict[str, int]], rating_data: Optional[Dict], step: int):
+    """Add `step` to the bucket of the rating's model/endpoint"""
+    if not isinstance(rating_data, dict) or rating_data.get("rating") not in RATINGS:
+        return
+    key = _stats_key(rating_data.get("model"), rating_data.get("endpoint"))
+    bucket = deltas.setdefault(key, dict.fromkeys(RATINGS, 0))
+    bucket[rating_data["rating"]] += step
+
+def _is_expired(rating_data, cutoff_date: int) -> bool:
+    if not isinstance(rating_data, dict):
+        return True
+    if "ts" in rating_data:
+        return rating_data["ts"] <= cutoff_date
+    if "timestamp" not in rating_data:
+        return True
+    # ratings logged before "ts" was stored
+    try:
+        return datetime.fromisoformat(rating_data["timestamp"]).timestamp() <= cutoff_date
+    except (TypeError, ValueError):
+        # Keep ratings with invalid timestamps for now
+        return False
+
 class ResponseRating:
     """Handles response rating and logging"""
     
     def __init__(self, config: Config):
         self.config = config
+        self._queue: asyncio.Queue[Optional[Tuple[str, Dict]]] = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        # keeps rating_stats in step with response_ratings
+        self._lock = asyncio.Lock()
+    
+    def start(self):
+        """Start the background worker that writes queued ratings"""
+        if not self._worker:
+            self._worker = asyncio.create_task(self._flush_loop())
+    
+    async def stop(self):
+        """Stop the background worker once every queued rating is written"""
+        if self._worker:
+            self._queue.put_nowait(None)
+            await self._worker
+            self._worker = None
+    
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = loop.time() + RATING_FLUSH_INTERVAL
+            while len(batch) < RATING_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self.log_ratings_batch(batch)
+    
+    def _build_rating(self, user_id: int, guild_id: int, model: str, endpoint: str,
+                      rating: str, response_content: str = None) -> Dict:
+        return {
+            "user_id": user_id,
+            "guild_id": guild_id,
+            "model": model,
+            "endpoint": endpoint,
+            "rating": rating,  # "thumbs_up" or "thumbs_down"
+            "ts": int(time.time()),
+            "response_content": response_content[:500] if response_content else None  # Truncate for storage
+        }
+    
+    def queue_rating(self, message_id: int, user_id: int, guild_id: int,
+                     model: str, endpoint: str, rating: str,
+                     response_content: str = None):
+        """Queue a user rating to be written with the next batch"""
+        rating_data = self._build_rating(user_id, guild_id, model, endpoint, rating, response_content)
+        self._queue.put_nowait((str(message_id), rating_data))
     
     async def log_rating(self, message_id: int, user_id: int, guild_id: int, 
                         model: str, endpoint: str, rating: str, 
                         response_content: str = None):
         """Log a user rating for a response"""
+        rating_data = self._build_rating(user_id, guild_id, model, endpoint, rating, response_content)
+        await self.log_ratings_batch([(str(message_id), rating_data)])
+    
+    async def log_ratings_batch(self, items: List[Tuple[str, Dict]]):
+        """Write several ratings, only rewriting the whole dict for multi-rating batches"""
         try:
-            ratings = await self.config.response_ratings()
-            if not isinstance(ratings, dict):
-                ratings = {}
-            
-            rating_data = {
-                "user_id": user_id,
-                "guild_id": guild_id,
-                "model": model,
-                "endpoint": endpoint,
-                "rating": rating,  # "thumbs_up" or "thumbs_down"
-                "timestamp": datetime.now().isoformat(),
-                "response_content": response_content[:500] if response_content else None  # Truncate for storage
-            }
-            
-            ratings[str(message_id)] = rating_data
-            await self.config.response_ratings.set(ratings)
+            async with self._lock:
+                await self._get_stats()
+                deltas = {}
+                if len(items) == 1:
+                    # a single rating only needs its own key, no read of the existing ratings
+                    message_id, rating_data = items[0]
+                    previous = await self.config.response_ratings.get_raw(message_id, default=None)
+                    _count_rating(deltas, previous, -1)
+                    _count_rating(deltas, rating_data, 1)
+                    await self.config.response_ratings.set_raw(message_id, value=rating_data)
+                else:
+                    # one read-modify-write is cheaper than a config write per rating
+                    ratings = await self.config.response_ratings()
+                    if not isinstance(ratings, dict):
+                        ratings = {}
+                    
+                    for message_id, rating_data in items:
+                        _count_rating(deltas, ratings.get(message_id), -1)
+                        _count_rating(deltas, rating_data, 1)
+                        ratings[message_id] = rating_data
+                    await self.config.response_ratings.set(ratings)
+                await self._apply_stats(deltas)
             
-            logger.info(f"Logged {rating} rating for message {message_id} from user {user_id}")
+            logger.info(f"Logged {len(items)} rating(s)")
             
         except Exception as e:
             logger.error(f"Failed to log rating: {e}")
@@ -42,34 +141,58 @@ class ResponseRating:
     async def get_rating(self, message_id: int) -> Optional[Dict]:
         """Get rating for a specific message"""
         try:
-            ratings = await self.config.response_ratings()
-            return ratings.get(str(message_id))
+            rating_data = await self.config.response_ratings.get_raw(str(message_id), default=None)
+            if isinstance(rating_data, dict) and "timestamp" not in rating_data and "ts" in rating_data:
+                # only derived for display, stored ratings keep the epoch seconds
+                rating_data["timestamp"] = datetime.fromtimestamp(rating_data["ts"]).isoformat()
+            return rating_data
         except Exception as e:
             logger.error(f"Failed to get rating: {e}")
             return None
     
+    async def _get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get the per model/endpoint rating counts, building them from stored ratings if missing"""
+        stats = await self.config.rating_stats()
+        if stats is not None:
+            return stats
+        # only happens once, for ratings logged before the counts were kept
+        stats = {}
+        ratings = await self.config.response_ratings()
+        if isinstance(ratings, dict):
+            for rating_data in ratings.values():
+                _count_rating(stats, rating_data, 1)
+        await self.config.rating_stats.set(stats)
+        return stats
+    
+    async def _apply_stats(self, deltas: Dict[str, Dict[str, int]]):
+        if not deltas:
+            return
+        stats = await self.config.rating_stats() or {}
+        for key, delta in deltas.items():
+            bucket = stats.setdefault(key, dict.fromkeys(RATINGS, 0))
+            for rating, step in delta.items():
+                bucket[rating] = bucket.get(rating, 0) + step
+        await self.config.rating_stats.set(stats)
+    
     async def get_model_stats(self, model: str = None, endpoint: str = None) -> Dict:
         """Get aggregated statistics for ratings"""
         try:
-            ratings = await self.config.response_ratings()
-            if not isinstance(ratings, dict):
-                return {"thumbs_up": 0, "thumbs_down": 0, "total": 0}
+            async with self._lock:
+                stats = await self._get_stats()
             
             thumbs_up = 0
             thumbs_down = 0
             
-            for rating_data in ratings.values():
-                if isinstance(rating_data, dict):
-                    # Filter by model/endpoint if specified
-                    if model and rating_data.get("model") != model:
-                        continue
-                    if endpoint and rating_data.get("endpoint") != endpoint:
-                        continue
-                    
-                    if rating_data.get("rating") == "thumbs_up":
-                        thumbs_up += 1
-                    elif rating_data.get("rating") == "thumbs_down":
-                        thumbs_down += 1
+            for key, bucket in stats.items():
+                bucket_model, _, bucket_endpoint = key.rpartition("|")
+                # Filter by model/endpoint if specified
+                if model and bucket_model != model:
+                    continue
+                if endpoint and bucket_endpoint != endpoint:
+                    continue
+                
+                thumbs_up += bucket.get("thumbs_up", 0)
+                thumbs_down += bucket.get("thumbs_down", 0)
             
             return {
                 "thumbs_up": thumbs_up,
@@ -84,25 +207,25 @@ class ResponseRating:
     async def cleanup_old_ratings(self, days_to_keep: int = 30):
         """Clean up ratings older than specified days"""
         try:
-            ratings = await self.config.response_ratings()
-            if not isinstance(ratings, dict):
-                return
-            
-            cutoff_date = datetime.now().timestamp() - (days_to_keep * 24 * 60 * 60)
-            cleaned_ratings = {}
-            
-            for message_id, rating_data in ratings.items():
-                if isinstance(rating_data, dict) and "timestamp" in rating_data:
-                    try:
-                        rating_timestamp = datetime.fromisoformat(rating_data["timestamp"]).timestamp()
-                        if rating_timestamp > cutoff_date:
-                            cleaned_ratings[message_id] = rating_data
-                    except:
-                        # Keep ratings with invalid timestamps for now
-                        cleaned_ratings[message_id] = rating_data
-                        
-            await self.config.response_ratings.set(cleaned_ratings)
-            logger.info(f"Cleaned up old ratings, kept {len(cleaned_ratings)} out of {len(ratings)}")
-            
+            async with self._lock:
+                await self._cleanup_old_ratings(days_to_keep)
         except Exception as e:
-            logger.error(f"Failed to cleanup old ratings: {e}")
\ No newline at end of file
+            logger.error(f"Failed to cleanup old ratings: {e}")
+    
+    async def _cleanup_old_ratings(self, days_to_keep: int):
+        await self._get_stats()
+        ratings = await self.config.response_ratings()
+        if not isinstance(ratings, dict):
+            return
+        
+        cutoff_date = int(time.time()) - (days_to_keep * 24 * 60 * 60)
+        total = len(ratings)
+        expired = [message_id for message_id, rating_data in ratings.items()
+                   if _is_expired(rating_data, cutoff_date)]
+        if expired:
+            deltas = {}
+            for message_id in expired:
+                _count_rating(deltas, ratings.pop(message_id), -1)
+            await self.config.response_ratings.set(ratings)
+            await self._apply_stats(deltas)
+        logger.info(f"Cleaned up old ratings, kept {len(ratings)} out of {total}")
\ No newline at end of file
@@ -1,29 +1,141 @@
 import asyncio
+import functools
 import logging
 import re
+import time
+from typing import Optional
 from redbot.core import Config, commands
 from aiuser.config.constants import REGEX_RUN_TIMEOUT
+from aiuser.utils.cache import Cache
 from aiuser.utils.utilities import to_thread
 
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+try:
+    # optional linear-time engine, see README
+    import re2
+except ImportError:
+    re2 = None
+
 logger = logging.getLogger("red.bz_cogs.aiuser")
 
-# Use to_thread to compile & apply a regex pattern
+# numbered/named backreferences and conditional groups would point at the wrong group once fused
+BACKREFERENCE_PATTERN = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+# global inline flags (eg. "(?i)") would apply to every fused pattern before Python 3.11
+GLOBAL_FLAGS_PATTERN = re.compile(r"\(\?[aiLmsux]+\)")
+
+RECENT_AUTHORS_TTL = 10
+# channel id -> (expiry, recent author display names)
+_recent_authors: Cache[int, tuple[float, frozenset[str]]] = Cache(limit=100)
+# fused patterns whose check timed out, applied sequentially instead
+_ungated: set[str] = set()
+
+def _compile(pattern_str: str, fast: bool, log_fallback: bool = True) -> re.Pattern:
+    if fast and re2:
+        try:
+            return re2.compile(pattern_str)
+        except Exception:
+            # unsupported syntax (eg. lookarounds), use the standard engine
+            if log_fallback:
+                logger.warning(f"Regex pattern not supported by RE2, using re instead: {pattern_str}")
+    return re.compile(pattern_str)
+
+@functools.lru_cache(maxsize=512)
+def _compiled(pattern_str: str, fast: bool = False) -> re.Pattern:
+    return _compile(pattern_str, fast)
+
+@functools.lru_cache(maxsize=128)
+def _fused(pattern_strs: tuple[str, ...], fast: bool = False) -> re.Pattern:
+    # unsupported patterns are already logged individually
+    return _compile("|".join(f"(?:{p})" for p in pattern_strs), fast, log_fallback=False)
+
+@functools.lru_cache(maxsize=512)
+def _extract_literal(pattern_str: str) -> Optional[str]:
+    """Longest run of plain characters every match of the pattern must contain"""
+    try:
+        parsed = sre_parse.parse(pattern_str)
+    except Exception:
+        return None
+    if parsed.state.flags & re.IGNORECASE:
+        return None
+
+    # only top-level literals are required, anything nested may be optional or alternated
+    longest, run = "", []
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        if len(run) > len(longest):
+            longest = "".join(run)
+        run = []
+    if len(run) > len(longest):
+        longest = "".join(run)
+    return longest or None
+
+def clear_pattern_cache():
+    """Drop compiled removelist patterns, e.g. after the removelist changes"""
+    _compiled.cache_clear()
+    _fused.cache_clear()
+    _extract_literal.cache_clear()
+    _ungated.clear()
+
+def _apply_sequentially(patterns: list[re.Pattern], literals: list[Optional[str]], text: str, progress: list) -> str:
+    for i, (pattern, literal) in enumerate(zip(patterns, literals)):
+        if literal and literal not in text:
+            continue
+        # lets the caller tell which pattern was running, and the text before it, if this times out
+        progress[:] = [i, text]
+        text = pattern.sub('', text).strip(' \n')
+    return text
+
+# Use to_thread to apply all compiled patterns in a single worker call
 @to_thread(timeout=REGEX_RUN_TIMEOUT)
-def compile_and_apply(pattern_str: str, text: str) -> str:
-    pattern = re.compile(pattern_str)
-    return pattern.sub('', text).strip(' \n')
+def apply_all(patterns: list[re.Pattern], literals: list[Optional[str]], text: str, progress: list) -> str:
+    return _apply_sequentially(patterns, literals, text, progress)
+
+# Use to_thread to check the fused alternation first, and only apply the patterns in order if any matches.
+# If nothing matches the (already stripped) text, no pattern would change it, so the result is identical.
+@to_thread(timeout=REGEX_RUN_TIMEOUT)
+def apply_fused(fused: re.Pattern, patterns: list[re.Pattern], literals: list[Optional[str]], text: str,
+                progress: list) -> str:
+    # skip the full scan when no pattern's required literal is present
+    if all(literals) and not any(literal in text for literal in literals):
+        return text
+    if not fused.search(text):
+        return text
+    return _apply_sequentially(patterns, literals, text, progress)
+
+async def get_recent_authors(ctx: commands.Context) -> frozenset[str]:
+    now = time.monotonic()
+    cached = _recent_authors[ctx.channel.id]
+    if cached and cached[0] > now:
+        authors = cached[1]
+    else:
+        authors = frozenset([
+            msg.author.display_name async for msg in ctx.channel.history(limit=10)
+            if msg.author != ctx.guild.me
+        ])
+        _recent_authors[ctx.channel.id] = (now + RECENT_AUTHORS_TTL, authors)
+
+    # the cached set may predate the message being replied to
+    if ctx.message.author != ctx.guild.me:
+        authors = authors | {ctx.message.author.display_name}
+    return authors
 
 async def remove_patterns_from_response(ctx: commands.Context, config: Config, response: str) -> str:
     # Get patterns from config and replace "{botname}".
     patterns = await config.guild(ctx.guild).removelist_regexes()
+    fast = await config.removelist_fast_regex()
     botname = ctx.message.guild.me.nick or ctx.bot.user.display_name
     patterns = [p.replace(r'{botname}', botname) for p in patterns]
 
     # Expand patterns that have "{authorname}" based on recent authors.
-    authors = {
-        msg.author.display_name async for msg in ctx.channel.history(limit=10)
-        if msg.author != ctx.guild.me
-    }
+    authors = frozenset()
+    if any('{authorname}' in p for p in patterns):
+        authors = await get_recent_authors(ctx)
     expanded_patterns = []
     for pattern in patterns:
         if '{authorname}' in pattern:
@@ -32,13 +144,52 @@ async def remove_patterns_from_response(ctx: commands.Context, config: Config, r
         else:
             expanded_patterns.append(pattern)
 
-    # Apply each pattern sequentially.
-    cleaned = response.strip(' \n')
+    valid_patterns = []
+    compiled = []
+    literals = []
     for pattern in expanded_patterns:
         try:
-            cleaned = await compile_and_apply(pattern, cleaned)
+            compiled.append(_compiled(pattern, fast))
+            valid_patterns.append(pattern)
+            literals.append(_extract_literal(pattern))
+        except Exception:
+            logger.warning(f"Error compiling regex pattern: {pattern}", exc_info=True)
+
+    fused = None
+    if valid_patterns and not any(
+        BACKREFERENCE_PATTERN.search(p) or GLOBAL_FLAGS_PATTERN.search(p) for p in valid_patterns
+    ):
+        try:
+            fused = _fused(tuple(valid_patterns), fast)
+            if fast and re2 and isinstance(fused, re.Pattern):
+                # one unsupported pattern would put every pattern back on the backtracking engine
+                fused = None
+        except Exception:
+            logger.debug("Unable to fuse regex patterns, applying sequentially", exc_info=True)
+
+    cleaned = response.strip(' \n')
+    start = 0
+    while start < len(compiled):
+        progress = [None, cleaned]
+        try:
+            if fused and start == 0 and fused.pattern not in _ungated:
+                cleaned = await apply_fused(fused, compiled, literals, cleaned, progress)
+            else:
+                cleaned = await apply_all(compiled[start:], literals[start:], cleaned, progress)
+            break
         except asyncio.TimeoutError:
-            logger.warning(f"Timeout applying regex pattern: {pattern}")
+            # the timed out thread keeps running, so skip the slow pattern instead of running it again
+            index, cleaned = progress
+            if index is None:
+                # the fused check timed out and the slow pattern is unknown,
+                # apply this removelist sequentially from now on so it can be found and skipped
+                logger.warning(f"Timeout checking regex patterns in {ctx.guild.name}")
+                _ungated.add(fused.pattern)
+                break
+            index += start
+            logger.warning(f"Timeout applying regex pattern in {ctx.guild.name}: {valid_patterns[index]}")
+            start = index + 1
         except Exception:
-            logger.warning(f"Error applying regex pattern: {pattern}", exc_info=True)
-    return cleaned
\ No newline at end of file
+            logger.warning("Error applying regex patterns", exc_info=True)
+            break
+    return cleaned
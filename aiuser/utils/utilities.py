@@ -1,11 +1,12 @@
 import asyncio
 import functools
 import importlib
+import json
 import logging
 import random
 from datetime import datetime
 from pathlib import Path
-from typing import Callable, Coroutine
+from typing import TYPE_CHECKING, Callable, Coroutine
 
 import discord
 from discord import Message
@@ -15,6 +16,15 @@ from redbot.core import Config, commands
 from aiuser.config.constants import OPENROUTER_URL, YOUTUBE_URL_PATTERN
 from aiuser.functions.tool_call import ToolCall
 
+try:
+    # optional, faster (de)serializing of stored parameters/weights
+    import orjson
+except ImportError:
+    orjson = None
+
+if TYPE_CHECKING:
+    from aiuser.types.abc import MixinMeta
+
 logger = logging.getLogger("red.bz_cogs.aiuser")
 
 
@@ -106,6 +116,33 @@ def is_using_openrouter_endpoint(client: AsyncOpenAI):
     return str(client.base_url).startswith(OPENROUTER_URL)
 
 
+def json_loads(data: str):
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def json_dumps(obj) -> str:
+    if orjson:
+        # weights are keyed by int token ids
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+
+async def get_custom_parameters(cog: "MixinMeta", guild: discord.Guild) -> dict:
+    """ Returns a copy of the guild's parsed custom parameters, cached until they are set again """
+    if guild.id not in cog.cached_parameters:
+        parameters = await cog.config.guild(guild).parameters()
+        cog.cached_parameters[guild.id] = json_loads(parameters) if parameters else {}
+    return dict(cog.cached_parameters[guild.id])
+
+
+async def get_weights(cog: "MixinMeta", guild: discord.Guild) -> dict:
+    """ Returns a copy of the guild's parsed weights, cached until they are set again """
+    if guild.id not in cog.cached_weights:
+        weights = await cog.config.guild(guild).weights()
+        cog.cached_weights[guild.id] = json_loads(weights) if weights else {}
+    return dict(cog.cached_weights[guild.id])
+
+
 async def get_enabled_tools(config: Config, ctx: commands.Context) -> list:
     functions_dir = Path(__file__).parent.parent / 'functions'
 